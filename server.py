@@ -1,19 +1,48 @@
 #!/usr/bin/env python3
 """
-MarkItDown Flask Server for Optiease AI
+MarkItDown Quart Server for Optiease AI
 Supports all MarkItDown file formats and YouTube transcript extraction
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from quart import Quart, request, jsonify, make_response
+from quart.json.provider import DefaultJSONProvider
+from quart_cors import cors
+import httpx
+import aiofiles
+import asyncio
 import logging
 import sys
+import io
 import os
-import traceback
-from urllib.parse import urlparse, parse_qs
+import re
+import html
+import codecs
+import gzip
+import base64
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlparse
 import json
+import uuid
+import functools
+import hashlib
+import threading
+import tempfile
+import shutil
+import time
+import contextlib
+from collections import OrderedDict
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
+from xml.etree import ElementTree
+
+# Cross-process file locks for the session index (server workers share one storage folder)
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
 
 # Configure logging first
 logging.basicConfig(
@@ -41,20 +70,253 @@ except ImportError:
     YTDLP_AVAILABLE = False
     logger.warning("⚠️ yt-dlp not available. Install with: pip install yt-dlp")
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+# Import orjson for faster JSON parsing
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    logger.info("✅ orjson loaded successfully")
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.warning("⚠️ orjson not available, using the json module. Install with: pip install orjson")
+
+json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+def json_dumps(obj, indent=False):
+    """Serialize obj to UTF-8 JSON bytes - compact, or indented by 2 spaces"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# mkstemp creates its files as 0600; files staged through it are given the
+# mode open() would have, so saved sessions stay readable as before.
+# The umask is read once here, while the process is still single-threaded.
+UMASK = os.umask(0)
+os.umask(UMASK)
+NEW_FILE_MODE = 0o666 & ~UMASK
+
+
+def atomic_write_bytes(path, data):
+    """
+    Write a file by renaming a fully written sibling temp file over it,
+    so a crash mid-write can't leave a truncated file behind
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, NEW_FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# Import ijson for reading session headers without loading whole sessions
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+    logger.info("✅ ijson loaded successfully")
+except ImportError:
+    IJSON_AVAILABLE = False
+    logger.warning("⚠️ ijson not available, session headers will be read with a full parse. Install with: pip install ijson")
+
+# Import diskcache for on-disk transcript caching
+try:
+    from diskcache import Cache
+    DISKCACHE_AVAILABLE = True
+    logger.info("✅ diskcache loaded successfully")
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+    logger.warning("⚠️ diskcache not available, transcripts won't be cached. Install with: pip install diskcache")
+
+# Import brotli for compressing responses to clients that accept 'br'
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+    logger.info("✅ brotli loaded successfully")
+except ImportError:
+    BROTLI_AVAILABLE = False
+    logger.warning("⚠️ brotli not available, responses will only be gzip-compressed. Install with: pip install brotli")
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes responses with orjson
+    
+    orjson produces UTF-8 bytes several times faster than the json module,
+    which matters for the large transcripts and markdown returned by /convert
+    """
+    
+    def dumps(self, obj, **kwargs):
+        # Fall back to the default provider for types orjson doesn't know
+        return orjson.dumps(obj, default=self.default).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+app = Quart(__name__)
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
+app = cors(app)  # Enable CORS for all routes
+
+# Quart defaults to a 16 MB body limit and 60 s response timeout; large
+# documents and long transcripts need more than that, but request bodies are
+# still capped so a single upload or session save can't exhaust memory/disk
+app.config['MAX_CONTENT_LENGTH'] = 256 * 1024 * 1024
+app.config['RESPONSE_TIMEOUT'] = None
+
+# Converted documents, transcripts and sessions are text/JSON and shrink
+# several times over when compressed; tiny bodies aren't worth the CPU
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/plain', 'text/markdown', 'text/html']
+app.config['COMPRESS_LEVEL'] = 5
+app.config['COMPRESS_BR_LEVEL'] = 4
+app.config['COMPRESS_MIN_SIZE'] = 1024
+
+
+@app.before_request
+async def reject_oversized_body():
+    """
+    Turn away bodies over MAX_CONTENT_LENGTH before any of them is read
+    (the endpoints' catch-all error handling would otherwise report a 500)
+    """
+    max_length = app.config['MAX_CONTENT_LENGTH']
+    if max_length is not None and (request.content_length or 0) > max_length:
+        return jsonify({'error': 'Request too large', 'max_bytes': max_length}), 413
+
+
+def compress_body(data, encoding):
+    """Compress a response body with 'br' or 'gzip'"""
+    if encoding == 'br':
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=app.config['COMPRESS_BR_LEVEL'])
+    return gzip.compress(data, compresslevel=app.config['COMPRESS_LEVEL'], mtime=0)
+
+
+@app.after_request
+async def compress_response(response):
+    """
+    Compress text/JSON responses for clients that send a matching Accept-Encoding
+    (progress streams are text/event-stream and pass through untouched)
+    """
+    if (response.mimetype not in app.config['COMPRESS_MIMETYPES']
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    encoding = request.accept_encodings.best_match(['br', 'gzip'] if BROTLI_AVAILABLE else ['gzip'])
+    response.vary.add('Accept-Encoding')
+    if encoding is None:
+        return response
+    
+    data = await response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    
+    # Multi-MB markdown takes a while to compress, so keep it off the event loop
+    response.set_data(await asyncio.to_thread(compress_body, data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+# Shared HTTP client so subtitle downloads don't block the event loop.
+# Connections are kept alive and multiplexed over HTTP/2, so repeat fetches
+# from YouTube's hosts skip the TCP + TLS handshake.
+HTTP_CLIENT = httpx.AsyncClient(
+    http2=True,
+    timeout=30,
+    limits=httpx.Limits(max_keepalive_connections=32)
+)
+
+
+@app.after_serving
+async def close_http_client():
+    """Release pooled connections on shutdown"""
+    await HTTP_CLIENT.aclose()
+
+
+# Transcript cache - a hit skips every YouTube round trip for the video
+# SQLite-backed and shared by server workers, so it's only called through asyncio.to_thread
+TRANSCRIPT_CACHE = Cache(str(Path(__file__).parent / '.yt_cache')) if DISKCACHE_AVAILABLE else None
+TRANSCRIPT_CACHE_TTL = 7 * 86400  # 7 days
+YTDLP_INFO_CACHE_TTL = 86400  # 24 hours
+
+# YouTube's innertube player endpoint - lists caption tracks in a single request
+PLAYER_API_URL = 'https://www.youtube.com/youtubei/v1/player'
+PLAYER_API_CLIENT = {'clientName': 'ANDROID', 'clientVersion': '19.09.37', 'androidSdkVersion': 30}
+PLAYER_API_HEADERS = {'User-Agent': 'com.google.android.youtube/19.09.37 (Linux; U; Android 11) gzip'}
+
+# yt-dlp options for listing English subtitle tracks without downloading anything
+YTDLP_OPTS = {
+    'skip_download': True,
+    'writesubtitles': True,
+    'writeautomaticsub': True,
+    'subtitleslangs': ['en'],
+    'quiet': True,
+    'no_warnings': True,
+}
+
+# Subtitle format priority: json3 > srv3 > vtt > srv2 > srv1 (avoid m3u8)
+SUBTITLE_PRIORITY_FORMATS = ('json3', 'srv3', 'vtt', 'srv2', 'srv1')
+
+get_entry_text = itemgetter('text')  # Transcript entry -> text, evaluated in C
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Copy uploads to disk in 1 MiB chunks
+SENDFILE_AVAILABLE = sys.platform.startswith('linux')  # file-to-file os.sendfile is Linux-only
+UPLOAD_SPOOL_SIZE = 8 * 1024 * 1024  # Batch uploads up to 8 MiB are converted from memory
+SUBTITLE_CHUNK_SIZE = 64 * 1024  # Feed subtitle downloads to the parsers in 64 KiB chunks
+
+# Converted uploads by content hash: "<extension>:<blake2b digest>" -> (text_content, markdown, title)
+# Oldest entries are evicted once the cached text passes CONVERSION_CACHE_MAX_BYTES
+CONVERSION_CACHE = OrderedDict()
+CONVERSION_CACHE_MAX_BYTES = 256 * 1024 * 1024
+CONVERSION_CACHE_SIZE = 0
+
+# Per-file content fields of a /convert-multiple result; '?fields=' picks a subset
+BATCH_RESULT_FIELDS = ('text', 'markdown', 'title')
+
+# Background conversion jobs: job_id -> asyncio.Queue of progress messages
+# Per process, so progress streaming needs a single server worker (see README)
+CONVERT_JOBS = {}
+JOB_EVENT_TIMEOUT = 120  # Seconds a progress stream waits for the next message
+JOB_RETENTION = 300  # Seconds a finished job's messages are kept for a late listener
+
+# Regex patterns, compiled once
+WHITESPACE_RE = re.compile(r'\s+')
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+BASE64_DATA_URL_RE = re.compile(r'data:[^,]*;base64,')
+CUE_NUMBER_RE = re.compile(r'^\d+$')
+# Maps < > : " / \ | ? * and control characters (0-31) to '_'
+INVALID_FILENAME_TABLE = str.maketrans(dict.fromkeys([*'<>:"/\\|?*', *map(chr, range(32))], '_'))
+YOUTU_BE_ID_RE = re.compile(r'youtu\.be/([a-zA-Z0-9_-]+)')
+YOUTUBE_WATCH_ID_RE = re.compile(r'[?&]v=([a-zA-Z0-9_-]+)')
 
 # Session storage configuration
 STORAGE_PATH = None  # Will be set by user via /set_storage_path endpoint
+STORAGE_DIR = None  # STORAGE_PATH as a Path, built once whenever the path changes
 STORAGE_CONFIG_FILE = Path(__file__).parent / 'storage_config.json'
 
+# Session list kept in STORAGE_PATH so /load_sessions doesn't parse every session.json
+# Maps chat folder name -> session summary; the lock serializes read-modify-write
+SESSION_INDEX_NAME = '.index.json'
+SESSION_INDEX_LOCK = threading.Lock()
+SESSION_INDEX_LOCK_NAME = '.index.lock'
+SESSION_INDEX_CACHE = {}  # index path -> (stat_key, parsed index)
+SESSION_HEADER_FIELDS = ('chat_id', 'title', 'created_at', 'updated_at')
+SESSION_HEADER_WORKERS = 16  # Threads reading unindexed session headers at once
+WRITABLE_DIRS = {}  # storage directory -> time.monotonic() it was last confirmed writable
+WRITABLE_DIR_TTL = 30  # Seconds a confirmed directory is trusted without re-checking
+SESSION_BLOBS_DIR = 'blobs'  # Attachment contents by SHA-256, shared by every chat in STORAGE_PATH
+SESSION_BLOB_FIELDS = ('content', 'fileData')  # Attachment fields moved into the blob store
+BASE64_CHUNK_CHARS = 64 * 1024  # Base64 attachments are decoded this many characters at a time (a multiple of 4)
+
 def sanitize_filename(filename):
     """
     Sanitize a filename to be safe for Windows/Unix file systems.
     Removes or replaces invalid characters and handles URLs.
     """
-    import re
-    
     # If it's a URL, extract a meaningful name
     if filename.startswith(('http://', 'https://', 'ftp://')):
         try:
@@ -64,8 +326,10 @@ def sanitize_filename(filename):
                 video_id = None
                 if 'youtu.be' in parsed.netloc:
                     video_id = parsed.path.strip('/')
-                elif 'v=' in parsed.query:
-                    video_id = parse_qs(parsed.query).get('v', [None])[0]
+                else:
+                    match = YOUTUBE_WATCH_ID_RE.search(filename)
+                    if match:
+                        video_id = match.group(1)
                 
                 if video_id:
                     filename = f'youtube_{video_id}.txt'
@@ -83,7 +347,7 @@ def sanitize_filename(filename):
     
     # Replace invalid Windows characters: < > : " / \ | ? *
     # Also replace control characters (0-31)
-    filename = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', filename)
+    filename = filename.translate(INVALID_FILENAME_TABLE)
     
     # Remove leading/trailing spaces and dots
     filename = filename.strip('. ')
@@ -104,22 +368,21 @@ def sanitize_filename(filename):
 
 def load_storage_config():
     """Load storage path from config file"""
-    global STORAGE_PATH
+    global STORAGE_PATH, STORAGE_DIR
     try:
         if STORAGE_CONFIG_FILE.exists():
-            with open(STORAGE_CONFIG_FILE, 'r') as f:
-                config = json.load(f)
-                STORAGE_PATH = config.get('storage_path')
-                if STORAGE_PATH:
-                    logger.info(f"📁 Loaded storage path: {STORAGE_PATH}")
+            config = json_loads(STORAGE_CONFIG_FILE.read_bytes())
+            STORAGE_PATH = config.get('storage_path')
+            if STORAGE_PATH:
+                STORAGE_DIR = Path(STORAGE_PATH)
+                logger.info(f"📁 Loaded storage path: {STORAGE_PATH}")
     except Exception as e:
         logger.error(f"Error loading storage config: {e}")
 
 def save_storage_config(path):
     """Save storage path to config file"""
     try:
-        with open(STORAGE_CONFIG_FILE, 'w') as f:
-            json.dump({'storage_path': path}, f, indent=2)
+        atomic_write_bytes(STORAGE_CONFIG_FILE, json_dumps({'storage_path': path}))
         logger.info(f"💾 Saved storage path: {path}")
     except Exception as e:
         logger.error(f"Error saving storage config: {e}")
@@ -136,6 +399,82 @@ except ImportError:
     MARKITDOWN_AVAILABLE = False
     logger.warning("⚠️ MarkItDown not installed. Install with: pip install 'markitdown[all]'")
 
+# Worker processes for CPU-heavy work (MarkItDown parsing, yt-dlp extraction).
+# Created on first use; spawn is used on every platform so workers never
+# inherit the event loop's threads through fork.
+CONVERT_EXECUTOR = None
+# Every server process has its own pool, so under 'hypercorn --workers N' set
+# SERVER_WORKERS=N to share the cores between them instead of oversubscribing
+SERVER_WORKERS = max(1, int(os.environ.get('SERVER_WORKERS', 1)))
+CONVERT_POOL_SIZE = max(1, (os.cpu_count() or 1) // SERVER_WORKERS)
+
+
+@functools.cache
+def get_markitdown():
+    """
+    Build the MarkItDown instance on first use, once per worker process
+    Workers that only run yt-dlp extraction never pay for plugin discovery
+    """
+    return MarkItDown()
+
+
+def get_convert_executor():
+    """Return the shared process pool, creating it on first use"""
+    global CONVERT_EXECUTOR
+    if CONVERT_EXECUTOR is None:
+        CONVERT_EXECUTOR = ProcessPoolExecutor(
+            max_workers=CONVERT_POOL_SIZE,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return CONVERT_EXECUTOR
+
+
+async def run_in_worker(func, *args):
+    """
+    Run a module-level (picklable) function in the process pool
+    A worker dying (e.g. OOM-killed on a huge PDF) breaks the whole pool, so
+    it's replaced and the call retried once; a second failure is raised
+    """
+    global CONVERT_EXECUTOR
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        executor = get_convert_executor()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            if attempt:
+                raise
+            # Concurrent calls fail together; only the first replaces the pool
+            if CONVERT_EXECUTOR is executor:
+                logger.warning("⚠️ A conversion worker died, restarting the process pool")
+                CONVERT_EXECUTOR = None
+                executor.shutdown(wait=False, cancel_futures=True)
+
+
+def do_convert(source):
+    """
+    Convert a file path or URL with the worker's MarkItDown instance
+    Returns: (text_content, markdown, title)
+    """
+    result = get_markitdown().convert(source)
+    return result.text_content, result.markdown, result.title
+
+
+def do_convert_bytes(data, extension):
+    """
+    Convert an in-memory upload with the worker's MarkItDown instance
+    Returns: (text_content, markdown, title)
+    """
+    result = get_markitdown().convert_stream(io.BytesIO(data), file_extension=extension)
+    return result.text_content, result.markdown, result.title
+
+
+@app.after_serving
+async def shutdown_convert_executor():
+    """Stop worker processes on shutdown"""
+    if CONVERT_EXECUTOR is not None:
+        CONVERT_EXECUTOR.shutdown(cancel_futures=True)
+
 # Supported file formats by MarkItDown
 SUPPORTED_FORMATS = {
     # Documents
@@ -194,28 +533,153 @@ SUPPORTED_FORMATS = {
 }
 
 
+def remove_temp_file(path):
+    """Delete a temp file; one that's already gone is fine, other failures are only logged"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"⚠️ Could not remove temp file {path}: {e}")
+
+
+def upload_fileno(stream):
+    """File descriptor behind an upload stream if its data is already on disk, else None"""
+    # Quart spools large uploads to a temp file; asking a spool that is still
+    # in memory for its fileno would force it onto disk, so check first
+    if getattr(stream, '_rolled', True) is False:
+        return None
+    try:
+        return stream.fileno()
+    except (AttributeError, OSError):
+        return None
+
+
+def copy_upload_file(stream, fd, suffix):
+    """
+    Copy the rest of an on-disk upload into a uniquely named temp file
+    Uses a single in-kernel os.sendfile where available, else 1 MiB copies
+    Blocking - runs with asyncio.to_thread
+    Returns: path of the temp file (the caller deletes it)
+    """
+    with tempfile.NamedTemporaryFile('wb', delete=False, suffix=suffix) as tmp:
+        if SENDFILE_AVAILABLE:
+            stream.flush()  # sendfile reads the file itself, not the stream's buffer
+            offset, size = stream.tell(), os.fstat(fd).st_size
+            while offset < size:
+                sent = os.sendfile(tmp.fileno(), fd, offset, size - offset)
+                if not sent:
+                    break
+                offset += sent
+        else:
+            shutil.copyfileobj(stream, tmp, UPLOAD_CHUNK_SIZE)
+    return tmp.name
+
+
+async def save_upload_to_tempfile(file):
+    """
+    Stream an uploaded file into a uniquely named temp file in 1 MiB chunks
+    Each write is awaited separately, so concurrent uploads interleave on the
+    event loop instead of each holding an executor thread for the whole copy
+    Uploads the server already spooled to disk are copied file-to-file instead
+    Returns: path of the temp file (the caller deletes it)
+    """
+    suffix = os.path.splitext(file.filename)[1]  # MarkItDown detects the type by extension
+    fd = upload_fileno(file.stream)
+    if fd is not None:
+        return await asyncio.to_thread(copy_upload_file, file.stream, fd, suffix)
+    
+    async with aiofiles.tempfile.NamedTemporaryFile('wb', delete=False, suffix=suffix) as tmp:
+        while chunk := file.stream.read(UPLOAD_CHUNK_SIZE):
+            await tmp.write(chunk)
+    return tmp.name
+
+
+def file_digest(path):
+    """BLAKE2b digest of a file's contents, read in 1 MiB chunks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def convert_upload(filename, data=None, temp_path=None):
+    """
+    Convert an upload held in memory (data) or saved to disk (temp_path),
+    reusing the result for identical content that was converted before
+    Returns: (text_content, markdown, title)
+    """
+    global CONVERSION_CACHE_SIZE
+    extension = os.path.splitext(filename)[1].lower()
+    if data is not None:
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    else:
+        digest = await asyncio.to_thread(file_digest, temp_path)
+    key = f"{extension}:{digest}"
+    
+    cached = CONVERSION_CACHE.get(key)
+    if cached is not None:
+        logger.info(f"⚡ Conversion cache hit for {filename}")
+        CONVERSION_CACHE.move_to_end(key)
+        return cached
+    
+    if data is not None:
+        result = await run_in_worker(do_convert_bytes, data, extension)
+    else:
+        result = await run_in_worker(do_convert, temp_path)
+    
+    CONVERSION_CACHE[key] = result
+    CONVERSION_CACHE_SIZE += conversion_size(result)
+    while CONVERSION_CACHE_SIZE > CONVERSION_CACHE_MAX_BYTES and CONVERSION_CACHE:
+        _, evicted = CONVERSION_CACHE.popitem(last=False)
+        CONVERSION_CACHE_SIZE -= conversion_size(evicted)
+    return result
+
+
+def conversion_size(result):
+    """Approximate size of a cached conversion: the length of its strings"""
+    return sum(len(value) for value in result if value)
+
+
+async def spool_upload(file):
+    """
+    Keep a small upload in memory and spill a large one to a temp file
+    Returns: (data, temp_path) - the bytes and None for uploads up to
+    UPLOAD_SPOOL_SIZE, otherwise None and the temp file path (the caller deletes it)
+    """
+    start = file.stream.tell()
+    if upload_fileno(file.stream) is not None:
+        # Already spooled to disk by the server - don't block the event loop reading it
+        data = await asyncio.to_thread(file.stream.read, UPLOAD_SPOOL_SIZE + 1)
+    else:
+        data = file.stream.read(UPLOAD_SPOOL_SIZE + 1)
+    if len(data) <= UPLOAD_SPOOL_SIZE:
+        return data, None
+    
+    file.stream.seek(start)
+    return None, await save_upload_to_tempfile(file)
+
+
 def clean_youtube_url(url):
     """
     Clean YouTube URL by removing tracking parameters
     Extracts video ID and returns clean URL
     """
-    import re
-    from urllib.parse import urlparse, parse_qs
-    
     # Extract video ID
     video_id = None
     
     # Handle youtu.be format
     if 'youtu.be' in url:
-        match = re.search(r'youtu\.be/([a-zA-Z0-9_-]+)', url)
+        match = YOUTU_BE_ID_RE.search(url)
         if match:
             video_id = match.group(1)
     
     # Handle youtube.com format
     elif 'youtube.com' in url:
-        parsed = urlparse(url)
-        query_params = parse_qs(parsed.query)
-        video_id = query_params.get('v', [None])[0]
+        match = YOUTUBE_WATCH_ID_RE.search(url)
+        if match:
+            video_id = match.group(1)
     
     if video_id:
         # Return clean URL
@@ -230,203 +694,313 @@ def extract_youtube_video_id(url):
     """
     Extract video ID from YouTube URL
     """
-    import re
-    
     # Handle youtu.be format
     if 'youtu.be' in url:
-        match = re.search(r'youtu\.be/([a-zA-Z0-9_-]+)', url)
+        match = YOUTU_BE_ID_RE.search(url)
         if match:
             return match.group(1)
     
     # Handle youtube.com format
     if 'youtube.com' in url:
-        parsed = urlparse(url)
-        query_params = parse_qs(parsed.query)
-        return query_params.get('v', [None])[0]
+        match = YOUTUBE_WATCH_ID_RE.search(url)
+        if match:
+            return match.group(1)
     
     return None
 
 
-def get_youtube_transcript(url):
+def ytdlp_extract_info(video_id, ydl_opts):
     """
-    Extract YouTube transcript using direct API (more reliable than MarkItDown)
-    Falls back to yt-dlp if youtube-transcript-api fails
-    Returns: dict with 'text', 'title', 'success' keys
+    Fetch subtitle tracks with yt-dlp
+    Blocking - runs in the worker process pool
+    Returns: dict with 'subtitles' and 'automatic_captions' keys
     """
-    video_id = extract_youtube_video_id(url)
-    if not video_id:
-        raise ValueError(f"Could not extract video ID from URL: {url}")
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+    # Only send back what we need - the full info dict is large and not always picklable
+    return {
+        'subtitles': info.get('subtitles') or {},
+        'automatic_captions': info.get('automatic_captions') or {}
+    }
+
+
+async def cache_transcript(key, result):
+    """Store a successful transcript result in the cache and return it"""
+    if TRANSCRIPT_CACHE is not None:
+        await asyncio.to_thread(TRANSCRIPT_CACHE.set, key, result, expire=TRANSCRIPT_CACHE_TTL)
+    return result
+
+
+async def player_api_subtitles(video_id):
+    """
+    List English caption tracks straight from YouTube's player API
+    One request and a small JSON body, instead of yt-dlp's extractor pipeline
+    Returns: subtitle list in yt-dlp's shape ([{'ext': ..., 'url': ...}])
+    """
+    logger.info("🔄 Trying player API method...")
     
-    logger.info(f"📺 Extracting transcript for video ID: {video_id} from URL: {url}")
+    response = await HTTP_CLIENT.post(
+        PLAYER_API_URL,
+        json={'context': {'client': PLAYER_API_CLIENT}, 'videoId': video_id},
+        headers=PLAYER_API_HEADERS
+    )
+    response.raise_for_status()
     
-    # Try yt-dlp first (more reliable for problematic videos)
-    if YTDLP_AVAILABLE:
-        try:
-            logger.info("🔄 Trying yt-dlp method...")
-            
-            ydl_opts = {
-                'skip_download': True,
-                'writesubtitles': True,
-                'writeautomaticsub': True,
-                'subtitleslangs': ['en'],
-                'quiet': True,
-                'no_warnings': True,
-            }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
-                
-                # Get subtitles
-                subtitles = info.get('subtitles', {}).get('en') or info.get('automatic_captions', {}).get('en')
-                
-                if subtitles:
-                    # Find the best subtitle format (prefer json3, srv3, or vtt - avoid m3u8 playlists)
-                    subtitle_url = None
-                    selected_ext = None
-                    
-                    # Priority: json3 > srv3 > vtt > srv2 > srv1 (avoid m3u8)
-                    priority_formats = ['json3', 'srv3', 'vtt', 'srv2', 'srv1']
-                    
-                    for fmt in priority_formats:
-                        for sub in subtitles:
-                            if sub.get('ext') == fmt:
-                                subtitle_url = sub['url']
-                                selected_ext = fmt
-                                break
-                        if subtitle_url:
-                            break
-                    
-                    # If no priority format found, use any non-m3u8 format
-                    if not subtitle_url:
-                        for sub in subtitles:
-                            if sub.get('ext') != 'm3u8':
-                                subtitle_url = sub['url']
-                                selected_ext = sub.get('ext')
-                                break
-                    
-                    if subtitle_url:
-                        logger.info(f"📥 Downloading subtitle format: {selected_ext} from URL")
-                        import requests
-                        response = requests.get(subtitle_url, timeout=30)
-                        
-                        if response.status_code == 200:
-                            content = response.text
-                            
-                            # Check if we accidentally got an M3U8 playlist
-                            if content.startswith('#EXTM3U') or '#EXT-X-' in content:
-                                logger.warning("⚠️ Got M3U8 playlist instead of subtitles, skipping yt-dlp method")
-                                raise Exception("M3U8 playlist received instead of subtitles")
-                            
-                            # Parse different subtitle formats
-                            import re
-                            
-                            if selected_ext == 'json3':
-                                # YouTube JSON3 format
-                                try:
-                                    import json
-                                    data = json.loads(content)
-                                    events = data.get('events', [])
-                                    text_lines = []
-                                    for event in events:
-                                        if 'segs' in event:
-                                            for seg in event['segs']:
-                                                if 'utf8' in seg:
-                                                    text_lines.append(seg['utf8'].strip())
-                                    full_text = ' '.join(text_lines)
-                                    # Clean up extra spaces
-                                    full_text = re.sub(r'\s+', ' ', full_text).strip()
-                                except Exception as json_err:
-                                    logger.error(f"JSON3 parsing failed: {json_err}")
-                                    raise
-                            
-                            elif selected_ext in ['srv1', 'srv2', 'srv3']:
-                                # YouTube SRV (XML) format
-                                try:
-                                    # Simple XML parsing - extract text between <text> tags
-                                    text_matches = re.findall(r'<text[^>]*>(.*?)</text>', content, re.DOTALL)
-                                    text_lines = []
-                                    for text in text_matches:
-                                        # Remove HTML entities and tags
-                                        text = re.sub(r'&amp;', '&', text)
-                                        text = re.sub(r'&lt;', '<', text)
-                                        text = re.sub(r'&gt;', '>', text)
-                                        text = re.sub(r'&quot;', '"', text)
-                                        text = re.sub(r'&#39;', "'", text)
-                                        text = re.sub(r'<[^>]+>', '', text)
-                                        text = text.strip()
-                                        if text:
-                                            text_lines.append(text)
-                                    full_text = ' '.join(text_lines)
-                                except Exception as srv_err:
-                                    logger.error(f"SRV parsing failed: {srv_err}")
-                                    raise
-                            
-                            elif 'WEBVTT' in content or selected_ext == 'vtt':
-                                # VTT format
-                                lines = content.split('\n')
-                                text_lines = []
-                                for line in lines:
-                                    line = line.strip()
-                                    # Skip empty lines, timestamps, WEBVTT headers, and cue identifiers
-                                    if line and not line.startswith('WEBVTT') and '-->' not in line and not re.match(r'^\d+$', line) and not line.startswith('NOTE'):
-                                        # Remove HTML tags
-                                        line = re.sub(r'<[^>]+>', '', line)
-                                        if line:
-                                            text_lines.append(line)
-                                full_text = ' '.join(text_lines)
-                            
-                            else:
-                                # Unknown format, try basic text extraction
-                                full_text = content
-                            
-                            # Clean up the text
-                            full_text = re.sub(r'\s+', ' ', full_text).strip()
-                            
-                            if full_text and len(full_text) > 50:  # Ensure we got meaningful content
-                                logger.info(f"✅ yt-dlp extracted {len(full_text)} characters using {selected_ext} format")
-                                logger.info(f"📄 Text preview: {full_text[:200]}...")
-                                
-                                return {
-                                    'success': True,
-                                    'text': full_text,
-                                    'video_id': video_id,
-                                    'language': 'en',
-                                    'is_generated': True
-                                }
-                            else:
-                                logger.warning(f"⚠️ Extracted text too short ({len(full_text)} chars), trying next method")
-                                raise Exception("Insufficient content extracted")
-        except Exception as ytdlp_error:
-            logger.warning(f"⚠️ yt-dlp method failed: {str(ytdlp_error)}")
-    
-    # Fallback to youtube-transcript-api
+    renderer = (response.json().get('captions') or {}).get('playerCaptionsTracklistRenderer') or {}
+    tracks = [
+        track for track in renderer.get('captionTracks', [])
+        if track.get('baseUrl') and track.get('languageCode', '').split('-')[0] == 'en'
+    ]
+    if not tracks:
+        raise Exception("No English caption tracks available")
+    
+    # Prefer uploaded captions over auto-generated ones, like yt-dlp's subtitles/automatic_captions
+    tracks.sort(key=lambda track: track.get('kind') == 'asr')
+    subtitle_url = httpx.URL(tracks[0]['baseUrl']).copy_set_param('fmt', 'json3')
+    return [{'ext': 'json3', 'url': str(subtitle_url)}]
+
+
+async def ytdlp_subtitles(video_id):
+    """
+    List English subtitles with yt-dlp
+    Returns: subtitle list ([{'ext': ..., 'url': ...}])
+    """
+    logger.info("🔄 Trying yt-dlp method...")
+    
+    info_key = f"info:{video_id}"
+    info = await asyncio.to_thread(TRANSCRIPT_CACHE.get, info_key) if TRANSCRIPT_CACHE is not None else None
+    if info is None:
+        info = await run_in_worker(ytdlp_extract_info, video_id, YTDLP_OPTS)
+        if TRANSCRIPT_CACHE is not None:
+            await asyncio.to_thread(TRANSCRIPT_CACHE.set, info_key, info, expire=YTDLP_INFO_CACHE_TTL)
+    
+    # Get subtitles
+    subtitles = info.get('subtitles', {}).get('en') or info.get('automatic_captions', {}).get('en')
+    if not subtitles:
+        raise Exception("No English subtitles available")
+    return subtitles
+
+
+async def iter_subtitle_chunks(response):
+    """Yield a subtitle response body in chunks, rejecting M3U8 playlists"""
+    first = True
+    async for chunk in response.aiter_bytes(SUBTITLE_CHUNK_SIZE):
+        if first:
+            first = False
+            # Check if we accidentally got an M3U8 playlist
+            if chunk.startswith(b'#EXTM3U') or b'#EXT-X-' in chunk:
+                logger.warning("⚠️ Got M3U8 playlist instead of subtitles, skipping this method")
+                raise Exception("M3U8 playlist received instead of subtitles")
+        yield chunk
+
+
+async def parse_json3(chunks, encoding):
+    """Join the caption segments of a YouTube JSON3 document (needs the whole body)"""
+    try:
+        data = json_loads(b''.join([chunk async for chunk in chunks]))
+    except Exception as json_err:
+        logger.error(f"JSON3 parsing failed: {json_err}")
+        raise
+    # Spaces are collapsed afterwards, so segments can be joined as-is
+    return ' '.join(
+        seg['utf8']
+        for event in data.get('events', ())
+        for seg in event.get('segs', ())
+        if 'utf8' in seg
+    )
+
+
+async def parse_srv(chunks, encoding):
+    """Join the text of each <text> node from a streamed SRV (XML) document"""
+    parser = ElementTree.XMLPullParser(events=('end',))
+    text_lines = []
+    
+    def collect():
+        for _, node in parser.read_events():
+            if node.tag == 'text':
+                # Text may still carry escaped entities and <font> tags
+                text = HTML_TAG_RE.sub('', html.unescape(''.join(node.itertext()))).strip()
+                if text:
+                    text_lines.append(text)
+                node.clear()
+    
+    try:
+        async for chunk in chunks:
+            parser.feed(chunk)
+            collect()
+        parser.close()
+        collect()
+    except ElementTree.ParseError as srv_err:
+        logger.error(f"SRV parsing failed: {srv_err}")
+        raise
+    return ' '.join(text_lines)
+
+
+def vtt_cue_text(line):
+    """Return the caption text on a VTT line, or None for headers/timestamps/cue ids"""
+    line = line.strip()
+    # Skip empty lines, timestamps, WEBVTT headers, and cue identifiers
+    if line and not line.startswith('WEBVTT') and '-->' not in line and not CUE_NUMBER_RE.match(line) and not line.startswith('NOTE'):
+        # Remove HTML tags
+        return HTML_TAG_RE.sub('', line)
+    return None
+
+
+async def parse_vtt(chunks, encoding):
+    """Join the caption text of a streamed VTT document, parsed one line at a time"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    text_lines = []
+    pending = ''
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        text_lines.extend(filter(None, map(vtt_cue_text, lines)))
+    pending += decoder.decode(b'', final=True)
+    text_lines.extend(filter(None, map(vtt_cue_text, pending.split('\n'))))
+    return ' '.join(text_lines)
+
+
+async def parse_other_subtitles(chunks, encoding):
+    """Fallback for unknown formats: VTT-style parsing if it looks like VTT, else the raw text"""
+    content = b''.join([chunk async for chunk in chunks]).decode(encoding, errors='replace')
+    if 'WEBVTT' in content:
+        return ' '.join(filter(None, map(vtt_cue_text, content.split('\n'))))
+    return content
+
+
+# Subtitle parser for each format; anything else goes to parse_other_subtitles
+SUBTITLE_PARSERS = {
+    'json3': parse_json3,
+    'srv1': parse_srv,
+    'srv2': parse_srv,
+    'srv3': parse_srv,
+    'vtt': parse_vtt,
+}
+
+
+async def subtitle_transcript(video_id, subtitles):
+    """
+    Download and parse the best format from a subtitle list
+    Raises if no usable transcript could be extracted
+    """
+    # Find the best subtitle format (prefer json3, srv3, or vtt - avoid m3u8 playlists)
+    # Index by extension once; reversed so the first entry of each format wins
+    by_ext = {sub.get('ext'): sub for sub in reversed(subtitles)}
+    
+    selected = next((by_ext[fmt] for fmt in SUBTITLE_PRIORITY_FORMATS if fmt in by_ext), None)
+    
+    # If no priority format found, use any non-m3u8 format
+    if selected is None:
+        selected = next((sub for sub in subtitles if sub.get('ext') != 'm3u8'), None)
+    
+    if selected is None:
+        raise Exception("No supported subtitle format available")
+    
+    subtitle_url = selected['url']
+    selected_ext = selected.get('ext')
+    
+    logger.info(f"📥 Downloading subtitle format: {selected_ext} from URL")
+    async with HTTP_CLIENT.stream('GET', subtitle_url) as response:
+        if response.status_code != 200:
+            raise Exception(f"Subtitle download failed with status {response.status_code}")
+        
+        parser = SUBTITLE_PARSERS.get(selected_ext, parse_other_subtitles)
+        full_text = await parser(iter_subtitle_chunks(response), response.encoding)
+    
+    # Clean up the text
+    full_text = WHITESPACE_RE.sub(' ', full_text).strip()
+    
+    if not full_text or len(full_text) <= 50:  # Ensure we got meaningful content
+        logger.warning(f"⚠️ Extracted text too short ({len(full_text)} chars), trying next method")
+        raise Exception("Insufficient content extracted")
+    
+    logger.info(f"✅ Extracted {len(full_text)} characters using {selected_ext} format")
+    logger.info(f"📄 Text preview: {full_text[:200]}...")
+    
+    return {
+        'success': True,
+        'text': full_text,
+        'video_id': video_id,
+        'language': 'en',
+        'is_generated': True
+    }
+
+
+async def caption_track_transcript(video_id):
+    """
+    Fetch subtitles listed by the player API, falling back to yt-dlp's listing
+    """
+    try:
+        return await subtitle_transcript(video_id, await player_api_subtitles(video_id))
+    except Exception as player_error:
+        if not YTDLP_AVAILABLE:
+            raise
+        logger.warning(f"⚠️ Player API method failed: {str(player_error)}")
+    
+    return await subtitle_transcript(video_id, await ytdlp_subtitles(video_id))
+
+
+async def simple_transcript(video_id):
+    """
+    Fetch an English transcript with youtube-transcript-api's get_transcript
+    """
+    logger.info(f"🔄 Trying simple transcript fetch...")
+    transcript_data = await asyncio.to_thread(
+        YouTubeTranscriptApi.get_transcript, video_id, languages=['en', 'en-US', 'en-GB']
+    )
+    
+    # Convert to readable text
+    full_text = "\n".join(map(get_entry_text, transcript_data))
+    
+    logger.info(f"✅ Successfully extracted {len(full_text)} characters using simple method")
+    logger.info(f"📄 Text preview: {full_text[:200]}...")
+    
+    return {
+        'success': True,
+        'text': full_text,
+        'video_id': video_id,
+        'language': 'en',
+        'is_generated': True
+    }
+
+
+async def fast_youtube_transcript(video_id):
+    """
+    Race caption tracks (player API, then yt-dlp) against youtube-transcript-api's
+    simple fetch - the first to succeed wins and the other is cancelled
+    Raises if every quick method fails
+    """
+    methods = {asyncio.create_task(caption_track_transcript(video_id)): 'Caption track'}
+    if YOUTUBE_API_AVAILABLE:
+        methods[asyncio.create_task(simple_transcript(video_id))] = 'Simple'
+    
+    pending = set(methods)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                logger.warning(f"⚠️ {methods[task]} method failed: {str(task.exception())}")
+    finally:
+        for task in pending:
+            task.cancel()
+    
+    raise Exception("Quick transcript methods failed")
+
+
+async def slow_youtube_transcript(video_id):
+    """
+    Try every transcript youtube-transcript-api can list, English first
+    """
     if not YOUTUBE_API_AVAILABLE:
-        raise Exception("No YouTube transcript extraction method available. Install youtube-transcript-api or yt-dlp")
+        raise Exception("Could not extract transcript. Install youtube-transcript-api and yt-dlp for more fallback methods")
     
     try:
-        # Try the simpler get_transcript method first (more reliable)
-        try:
-            logger.info(f"🔄 Trying simple transcript fetch...")
-            transcript_data = YouTubeTranscriptApi.get_transcript(video_id, languages=['en', 'en-US', 'en-GB'])
-            
-            # Convert to readable text
-            full_text = "\n".join([entry['text'] for entry in transcript_data])
-            
-            logger.info(f"✅ Successfully extracted {len(full_text)} characters using simple method")
-            logger.info(f"📄 Text preview: {full_text[:200]}...")
-            
-            return {
-                'success': True,
-                'text': full_text,
-                'video_id': video_id,
-                'language': 'en',
-                'is_generated': True
-            }
-        except:
-            logger.info(f"⚠️ Simple method failed, trying advanced method...")
+        logger.info(f"🔄 Trying advanced method...")
         
         # Get available transcripts
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+        transcript_list = await asyncio.to_thread(YouTubeTranscriptApi.list_transcripts, video_id)
         
         # Log all available transcripts for debugging
         available_langs = []
@@ -450,7 +1024,7 @@ def get_youtube_transcript(url):
         
         # Fetch the transcript with error handling
         try:
-            transcript_data = transcript.fetch()
+            transcript_data = await asyncio.to_thread(transcript.fetch)
         except Exception as fetch_error:
             logger.error(f"❌ Transcript fetch failed: {str(fetch_error)}")
             # Try alternative: get all available transcripts and try each one
@@ -460,7 +1034,7 @@ def get_youtube_transcript(url):
                 for alt_transcript in all_transcripts:
                     try:
                         logger.info(f"   Trying {alt_transcript.language}...")
-                        transcript_data = alt_transcript.fetch()
+                        transcript_data = await asyncio.to_thread(alt_transcript.fetch)
                         transcript = alt_transcript  # Update to the working one
                         logger.info(f"   ✅ Success with {alt_transcript.language}")
                         break
@@ -475,10 +1049,10 @@ def get_youtube_transcript(url):
         logger.info(f"📝 First 3 transcript entries: {transcript_data[:3] if len(transcript_data) >= 3 else transcript_data}")
         
         # Convert to readable text
-        full_text = "\n".join([entry['text'] for entry in transcript_data])
+        full_text = "\n".join(map(get_entry_text, transcript_data))
         
         # Log preview of extracted text
-        preview = full_text[:200] + "..." if len(full_text) > 200 else full_text
+        preview = (full_text[:200] + "...") if len(full_text) > 200 else full_text
         logger.info(f"✅ Successfully extracted {len(full_text)} characters from YouTube")
         logger.info(f"📄 Text preview: {preview}")
         
@@ -501,8 +1075,35 @@ def get_youtube_transcript(url):
         raise
 
 
+async def get_youtube_transcript(url):
+    """
+    Extract YouTube transcript (more reliable than MarkItDown)
+    Tries the quick methods first and only falls back to listing every
+    transcript when they all fail
+    Returns: dict with 'text', 'video_id', 'language', 'is_generated' and 'success' keys
+    """
+    video_id = extract_youtube_video_id(url)
+    if not video_id:
+        raise ValueError(f"Could not extract video ID from URL: {url}")
+    
+    logger.info(f"📺 Extracting transcript for video ID: {video_id} from URL: {url}")
+    
+    cache_key = f"{video_id}:en"
+    if TRANSCRIPT_CACHE is not None:
+        cached = await asyncio.to_thread(TRANSCRIPT_CACHE.get, cache_key)
+        if cached is not None:
+            logger.info(f"⚡ Transcript cache hit for video ID: {video_id}")
+            return cached
+    
+    try:
+        result = await fast_youtube_transcript(video_id)
+    except Exception:
+        result = await slow_youtube_transcript(video_id)
+    return await cache_transcript(cache_key, result)
+
+
 @app.route('/health', methods=['GET'])
-def health_check():
+async def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
@@ -511,14 +1112,143 @@ def health_check():
     })
 
 
+async def run_convert_job(job_id, temp_path, filename):
+    """Convert an uploaded file in the background, reporting to the job's queue"""
+    queue = CONVERT_JOBS[job_id]
+    try:
+        await queue.put({'type': 'progress', 'stage': 'converting', 'filename': filename})
+        text_content, markdown, title = await convert_upload(filename, temp_path=temp_path)
+        await queue.put({
+            'type': 'done',
+            'success': True,
+            'text': text_content,
+            'markdown': markdown,
+            'title': title,
+            'filename': filename
+        })
+    except Exception as e:
+        logger.error(f"Conversion error in job {job_id}: {str(e)}")
+        await queue.put({'type': 'done', 'success': False, 'error': f'Conversion failed: {str(e)}'})
+    finally:
+        remove_temp_file(temp_path)  # Clean up
+        # Drop the job if no one ever comes to read it
+        asyncio.get_running_loop().call_later(JOB_RETENTION, CONVERT_JOBS.pop, job_id, None)
+
+
+async def convert_batch_file(filename, data, temp_path, fields):
+    """
+    Convert one spooled upload from a batch (see spool_upload), deleting its temp file
+    fields: which of BATCH_RESULT_FIELDS to include in the result
+    Returns: the file's entry for the batch results (failures included)
+    """
+    try:
+        result = await convert_upload(filename, data, temp_path)
+        return {
+            "filename": filename,
+            **{field: value for field, value in zip(BATCH_RESULT_FIELDS, result) if field in fields},
+            "success": True
+        }
+    except Exception as e:
+        logger.error(f"Error converting {filename}: {str(e)}")
+        return {
+            "filename": filename,
+            "error": str(e),
+            "success": False
+        }
+    finally:
+        if temp_path is not None:
+            remove_temp_file(temp_path)  # Clean up
+
+
+async def run_batch_job(job_id, uploads, fields):
+    """
+    Convert uploaded files one at a time in the background, reporting each
+    result to the job's queue as soon as it's ready
+    uploads: list of (filename, data, temp_path) tuples from spool_upload
+    fields: which of BATCH_RESULT_FIELDS to include in each result
+    """
+    queue = CONVERT_JOBS[job_id]
+    total = len(uploads)
+    try:
+        for index, (filename, data, temp_path) in enumerate(uploads, 1):
+            message = await convert_batch_file(filename, data, temp_path, fields)
+            await queue.put({'type': 'file', 'index': index, 'total': total, **message})
+        await queue.put({'type': 'done', 'success': True, 'count': total})
+    except Exception as e:
+        logger.error(f"Batch conversion failed in job {job_id}: {str(e)}")
+        await queue.put({'type': 'done', 'success': False, 'error': f'Batch conversion failed: {str(e)}'})
+    finally:
+        # Drop the job if no one ever comes to read it
+        asyncio.get_running_loop().call_later(JOB_RETENTION, CONVERT_JOBS.pop, job_id, None)
+
+
+@app.route('/progress/<job_id>', methods=['GET'])
+async def convert_progress(job_id):
+    """
+    Stream a background conversion job's progress as Server-Sent Events
+    
+    Each event is a JSON message; the last one has type 'done' and carries
+    the same fields /convert would have returned
+    """
+    queue = CONVERT_JOBS.get(job_id)
+    if queue is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    async def generate():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=JOB_EVENT_TIMEOUT)
+                except asyncio.TimeoutError:
+                    message = {'type': 'done', 'success': False, 'error': 'Timed out waiting for progress'}
+                yield f"data: {app.json.dumps(message)}\n\n".encode('utf-8')
+                if message['type'] == 'done':
+                    break
+        finally:
+            CONVERT_JOBS.pop(job_id, None)
+    
+    response = await make_response(generate(), 200, {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache'
+    })
+    response.timeout = None
+    return response
+
+
+async def youtube_response(url, url_field):
+    """
+    Fetch a YouTube transcript and build the JSON response shared by /convert and /youtube
+    
+    url_field names the key the source URL is returned under ('source_url' or 'url')
+    """
+    # Clean YouTube URL (remove tracking parameters)
+    url = clean_youtube_url(url)
+    result = await get_youtube_transcript(url)
+    
+    logger.info(f"✅ YouTube transcript: {len(result['text'])} chars, language: {result.get('language', 'unknown')}")
+    
+    return jsonify({
+        'success': True,
+        'text': result['text'],
+        'markdown': result['text'],  # Transcript is plain text
+        'title': f"YouTube Transcript ({result['video_id']})",
+        url_field: url,
+        'type': 'youtube',
+        'language': result.get('language'),
+        'is_generated': result.get('is_generated', False)
+    })
+
+
 @app.route('/convert', methods=['POST'])
-def convert_file():
+async def convert_file():
     """
     Convert various file formats to Markdown
     
     Accepts:
     - multipart/form-data with 'file' field
     - JSON with 'url' field (for remote files or YouTube)
+    - Optional '?progress=1' query for file uploads: returns a 'job_id' right
+      away and streams the result from /progress/<job_id>
     
     Returns:
     - JSON with 'text' field containing converted content (for compatibility)
@@ -531,43 +1261,51 @@ def convert_file():
         }), 500
     
     try:
-        md = MarkItDown()
+        files = await request.files
         
         # Handle file upload
-        if 'file' in request.files:
-            file = request.files['file']
+        if 'file' in files:
+            file = files['file']
             if file.filename == '':
                 return jsonify({'error': 'No file selected'}), 400
             
             logger.info(f"Converting uploaded file: {file.filename}")
             
             # Save temporarily and convert
-            temp_path = f"temp_{file.filename}"
-            file.save(temp_path)
+            temp_path = await save_upload_to_tempfile(file)
+            
+            if request.args.get('progress'):
+                job_id = uuid.uuid4().hex
+                CONVERT_JOBS[job_id] = asyncio.Queue()
+                await CONVERT_JOBS[job_id].put({'type': 'progress', 'stage': 'uploaded', 'filename': file.filename})
+                app.add_background_task(run_convert_job, job_id, temp_path, file.filename)
+                return jsonify({
+                    'success': True,
+                    'job_id': job_id,
+                    'progress_url': f'/progress/{job_id}'
+                }), 202
             
             try:
-                result = md.convert(temp_path)
-                os.remove(temp_path)  # Clean up
+                text_content, markdown, title = await convert_upload(file.filename, temp_path=temp_path)
                 
                 return jsonify({
                     'success': True,
-                    'text': result.text_content,  # For compatibility with old code
-                    'markdown': result.markdown,
-                    'title': result.title,
+                    'text': text_content,  # For compatibility with old code
+                    'markdown': markdown,
+                    'title': title,
                     'filename': file.filename
                 })
             except Exception as e:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                logger.error(f"Conversion error: {str(e)}")
-                traceback.print_exc()
+                logger.exception(f"Conversion error: {str(e)}")
                 return jsonify({
                     'error': f'Conversion failed: {str(e)}'
                 }), 500
+            finally:
+                remove_temp_file(temp_path)  # Clean up
         
         # Handle URL conversion (including YouTube)
         elif request.is_json:
-            data = request.get_json()
+            data = await request.get_json()
             
             if 'url' in data:
                 url = data['url']
@@ -579,25 +1317,8 @@ def convert_file():
                 
                 if is_youtube:
                     logger.info("🎬 Detected YouTube URL - using direct transcript API")
-                    # Clean YouTube URL (remove tracking parameters)
-                    url = clean_youtube_url(url)
-                    
                     try:
-                        # Use direct YouTube API for better reliability
-                        result = get_youtube_transcript(url)
-                        
-                        logger.info(f"✅ YouTube transcript: {len(result['text'])} chars, language: {result.get('language', 'unknown')}")
-                        
-                        return jsonify({
-                            'success': True,
-                            'text': result['text'],
-                            'markdown': result['text'],  # Transcript is plain text
-                            'title': f"YouTube Transcript ({result['video_id']})",
-                            'source_url': url,
-                            'type': 'youtube',
-                            'language': result.get('language'),
-                            'is_generated': result.get('is_generated', False)
-                        })
+                        return await youtube_response(url, 'source_url')
                         
                     except Exception as e:
                         logger.error(f"❌ YouTube transcript extraction failed: {str(e)}")
@@ -609,10 +1330,10 @@ def convert_file():
                 
                 # Non-YouTube URL - use MarkItDown
                 try:
-                    result = md.convert(url)
+                    text_content, markdown, title = await run_in_worker(do_convert, url)
                     
                     # Validate that we got meaningful content (not just empty/error)
-                    if not result.text_content or len(result.text_content.strip()) < 10:
+                    if not text_content or len(text_content.strip()) < 10:
                         logger.error("No content extracted from URL")
                         return jsonify({
                             'error': 'No content extracted from URL',
@@ -620,7 +1341,7 @@ def convert_file():
                         }), 500
                     
                     # Check if the result looks like an error message
-                    text_lower = result.text_content.lower()
+                    text_lower = text_content.lower()
                     if 'no element found' in text_lower or 'attempt' in text_lower and 'failed' in text_lower:
                         logger.error("Conversion produced error-like content")
                         return jsonify({
@@ -629,19 +1350,18 @@ def convert_file():
                             'url': url
                         }), 500
                     
-                    logger.info(f"Successfully converted URL. Content length: {len(result.text_content)} chars")
+                    logger.info(f"Successfully converted URL. Content length: {len(text_content)} chars")
                     
                     return jsonify({
                         'success': True,
-                        'text': result.text_content,  # For compatibility
-                        'markdown': result.markdown,
-                        'title': result.title,
+                        'text': text_content,  # For compatibility
+                        'markdown': markdown,
+                        'title': title,
                         'source_url': url,
                         'type': 'url'
                     })
                 except Exception as e:
-                    logger.error(f"Error converting URL: {str(e)}")
-                    traceback.print_exc()
+                    logger.exception(f"Error converting URL: {str(e)}")
                     
                     return jsonify({
                         'error': 'Conversion failed',
@@ -664,7 +1384,7 @@ def convert_file():
 
 
 @app.route('/youtube', methods=['POST'])
-def convert_youtube():
+async def convert_youtube():
     """
     Convert YouTube video to Markdown (extract transcript)
     
@@ -680,40 +1400,21 @@ def convert_youtube():
         }), 500
     
     try:
-        data = request.get_json()
+        data = await request.get_json()
         url = data.get('url')
         
         if not url:
             return jsonify({'error': 'Missing YouTube URL'}), 400
         
         # Validate YouTube URL
-        if 'youtube.com' not in url and 'youtu.be' not in url:
+        if not extract_youtube_video_id(url):
             return jsonify({'error': 'Invalid YouTube URL'}), 400
         
         logger.info(f"🎬 Extracting YouTube transcript: {url}")
-        
-        # Clean YouTube URL (remove tracking parameters)
-        url = clean_youtube_url(url)
-        
-        # Use direct YouTube API
-        result = get_youtube_transcript(url)
-        
-        logger.info(f"✅ YouTube transcript: {len(result['text'])} chars, language: {result.get('language', 'unknown')}")
-        
-        return jsonify({
-            'success': True,
-            'text': result['text'],
-            'markdown': result['text'],  # Transcript is plain text
-            'title': f"YouTube Transcript ({result['video_id']})",
-            'url': url,
-            'type': 'youtube',
-            'language': result.get('language'),
-            'is_generated': result.get('is_generated', False)
-        })
+        return await youtube_response(url, 'url')
     
     except Exception as e:
         logger.error(f"❌ YouTube conversion error: {str(e)}", exc_info=True)
-        traceback.print_exc()
         
         return jsonify({
             'error': 'YouTube conversion failed',
@@ -723,10 +1424,15 @@ def convert_youtube():
 
 
 @app.route('/convert-multiple', methods=['POST'])
-def convert_multiple():
+async def convert_multiple():
     """
     Convert multiple uploaded files to markdown/text
     
+    Optional '?progress=1' query: returns a 'job_id' right away and streams
+    each file's result from /progress/<job_id> as soon as it is converted
+    Optional '?fields=markdown,title' query: only return those of 'text',
+    'markdown' and 'title' for each file (default: all three)
+    
     Returns: JSON with array of converted files
     """
     if not MARKITDOWN_AVAILABLE:
@@ -736,45 +1442,57 @@ def convert_multiple():
         }), 500
     
     try:
-        if 'files' not in request.files:
+        fields = request.args.get('fields')
+        if fields:
+            fields = {field.strip() for field in fields.split(',')} & set(BATCH_RESULT_FIELDS)
+            if not fields:
+                return jsonify({"error": f"'fields' must name at least one of: {', '.join(BATCH_RESULT_FIELDS)}"}), 400
+        else:
+            fields = set(BATCH_RESULT_FIELDS)
+        
+        request_files = await request.files
+        if 'files' not in request_files:
             return jsonify({"error": "No files provided"}), 400
         
-        files = request.files.getlist('files')
+        files = request_files.getlist('files')
         if not files:
             return jsonify({"error": "No files selected"}), 400
         
-        md = MarkItDown()
-        results = []
+        if request.args.get('progress'):
+            # The request body is only readable while the request is open,
+            # so every upload is saved before the job starts
+            uploads = []
+            try:
+                for file in files:
+                    if file.filename != '':
+                        uploads.append((file.filename, *await spool_upload(file)))
+            except BaseException:
+                # The job that would delete the saved temp files never starts
+                for _, _, temp_path in uploads:
+                    if temp_path is not None:
+                        remove_temp_file(temp_path)
+                raise
+            job_id = uuid.uuid4().hex
+            CONVERT_JOBS[job_id] = asyncio.Queue()
+            await CONVERT_JOBS[job_id].put({'type': 'progress', 'stage': 'uploaded', 'total': len(uploads)})
+            app.add_background_task(run_batch_job, job_id, uploads, fields)
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'progress_url': f'/progress/{job_id}'
+            }), 202
         
+        # Each conversion starts as soon as its file is on disk, so the next
+        # upload is written while earlier ones convert in the worker pool
+        conversions = []
         for file in files:
             if file.filename == '':
                 continue
             
-            temp_path = f"temp_{file.filename}"
-            file.save(temp_path)
-            
-            try:
-                result = md.convert(temp_path)
-                results.append({
-                    "filename": file.filename,
-                    "text": result.text_content,
-                    "markdown": result.markdown,
-                    "title": result.title,
-                    "success": True
-                })
-            except Exception as e:
-                logger.error(f"Error converting {file.filename}: {str(e)}")
-                results.append({
-                    "filename": file.filename,
-                    "error": str(e),
-                    "success": False
-                })
-            finally:
-                if os.path.exists(temp_path):
-                    try:
-                        os.remove(temp_path)
-                    except:
-                        pass
+            data, temp_path = await spool_upload(file)
+            conversions.append(asyncio.create_task(convert_batch_file(file.filename, data, temp_path, fields)))
+        
+        results = await asyncio.gather(*conversions)
         
         return jsonify({
             "success": True,
@@ -782,15 +1500,14 @@ def convert_multiple():
         })
         
     except Exception as e:
-        logger.error(f"Batch conversion failed: {str(e)}")
-        traceback.print_exc()
+        logger.exception(f"Batch conversion failed: {str(e)}")
         return jsonify({
             "error": f"Batch conversion failed: {str(e)}"
         }), 500
 
 
 @app.route('/formats', methods=['GET'])
-def get_supported_formats():
+async def get_supported_formats():
     """Get list of supported file formats"""
     return jsonify({
         'formats': SUPPORTED_FORMATS,
@@ -811,13 +1528,371 @@ def get_supported_formats():
 
 # ==================== SESSION STORAGE ENDPOINTS ====================
 
+# Blocking session file I/O - the endpoints run these with asyncio.to_thread
+# so disk reads and writes never stall the event loop
+
+def check_writable_dir(path_obj):
+    """
+    Raise if a directory isn't writable; successes are remembered for WRITABLE_DIR_TTL
+    os.access settles it on POSIX. On Windows it ignores ACLs, so a test file is written there
+    """
+    key = str(path_obj)
+    checked_at = WRITABLE_DIRS.get(key)
+    if checked_at is not None and time.monotonic() - checked_at < WRITABLE_DIR_TTL:
+        return
+    
+    if not os.access(path_obj, os.W_OK):
+        raise PermissionError(f"No write permission for {path_obj}")
+    if os.name == 'nt':
+        test_file = path_obj / '.write_test'
+        test_file.write_text('test')
+        test_file.unlink()
+    
+    WRITABLE_DIRS[key] = time.monotonic()
+
+
+def session_summary(session_data):
+    """The fields /load_sessions lists for a session"""
+    return {
+        'chat_id': session_data.get('chat_id'),
+        'title': session_data.get('title'),
+        'created_at': session_data.get('created_at'),
+        'updated_at': session_data.get('updated_at'),
+        'message_count': len(session_data.get('messages', []))
+    }
+
+
+def stat_key(path):
+    """
+    (inode, mtime, size) of a file - if all match, the file is assumed unchanged
+    The inode catches atomic replacements that land within one mtime tick
+    """
+    st = os.stat(path)
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def read_session_header(session_file):
+    """
+    Read a session.json file's summary (see session_summary)
+    With ijson the messages are only counted while streaming, never built in memory
+    """
+    if not IJSON_AVAILABLE:
+        return session_summary(json_loads(session_file.read_bytes()))
+    
+    summary = dict.fromkeys(SESSION_HEADER_FIELDS)
+    summary['message_count'] = 0
+    with open(session_file, 'rb') as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix == 'messages.item':
+                # One event per top-level item: start_map/start_array or a scalar
+                if event not in ('map_key', 'end_map', 'end_array'):
+                    summary['message_count'] += 1
+            elif prefix in SESSION_HEADER_FIELDS and event not in ('map_key', 'start_map', 'start_array', 'end_map', 'end_array'):
+                summary[prefix] = value
+    return summary
+
+
+def read_session_index(storage_dir):
+    """
+    Load the session index, or an empty one if it's missing or unreadable
+    The file is only parsed again when it has changed (see stat_key)
+    Returns: a copy the caller may modify
+    """
+    index_file = storage_dir / SESSION_INDEX_NAME
+    try:
+        key = stat_key(index_file)
+        cached = SESSION_INDEX_CACHE.get(index_file)
+        if cached is not None and cached[0] == key:
+            return dict(cached[1])
+        index = json_loads(index_file.read_bytes())
+    except (FileNotFoundError, ValueError):
+        return {}
+    SESSION_INDEX_CACHE[index_file] = (key, index)
+    return dict(index)
+
+
+@contextlib.contextmanager
+def session_index_lock(storage_dir):
+    """
+    Hold the session index for a read-modify-write
+    The thread lock covers this process; a lock file covers the other server workers
+    """
+    with SESSION_INDEX_LOCK, open(storage_dir / SESSION_INDEX_LOCK_NAME, 'a+b') as f:
+        if os.name == 'nt':
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield  # Closing the file releases the lock
+
+
+def write_session_index(storage_dir, index):
+    """Replace the session index atomically"""
+    index_file = storage_dir / SESSION_INDEX_NAME
+    atomic_write_bytes(index_file, json_dumps(index))
+    SESSION_INDEX_CACHE[index_file] = (stat_key(index_file), dict(index))
+
+
+def store_blob(storage_dir, iter_chunks):
+    """
+    Store content in the content-addressed blob store, once per distinct content
+    iter_chunks() returns a fresh iterator over the content's bytes; it's walked
+    once to hash and, only for new content, once more to write
+    Returns: (SHA-256 hex digest, blob path)
+    """
+    digest = hashlib.sha256()
+    for chunk in iter_chunks():
+        digest.update(chunk)
+    digest = digest.hexdigest()
+    
+    blob_path = storage_dir / SESSION_BLOBS_DIR / digest[:2] / digest
+    if not blob_path.exists():
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=blob_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter_chunks():
+                    f.write(chunk)
+            os.chmod(tmp_path, NEW_FILE_MODE)
+            os.replace(tmp_path, blob_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return digest, blob_path
+
+
+def iter_base64(content, start):
+    """
+    Decode base64 text from start onwards, BASE64_CHUNK_CHARS characters at a time
+    Raises ValueError unless each chunk re-encodes to exactly the same text,
+    so the original string can always be rebuilt from the stored bytes
+    """
+    for offset in range(start, len(content), BASE64_CHUNK_CHARS):
+        chunk = content[offset:offset + BASE64_CHUNK_CHARS]
+        data = base64.b64decode(chunk, validate=True)
+        if base64.b64encode(data).decode('ascii') != chunk:
+            raise ValueError("Base64 content is not in canonical form")
+        yield data
+
+
+def copy_upload(blob_path, file_path):
+    """
+    Copy a blob into a chat's uploads folder for people browsing it
+    Always a separate file, never a link, so editing it can't change the shared blob
+    The copy carries the blob's mtime; while its size and mtime still match, it's left alone
+    """
+    blob_stat = blob_path.stat()
+    try:
+        file_stat = file_path.stat()
+        if (file_stat.st_size, file_stat.st_mtime_ns) == (blob_stat.st_size, blob_stat.st_mtime_ns):
+            return
+    except FileNotFoundError:
+        pass
+    
+    # A unique temp name, so concurrent saves of the same chat never share one
+    tmp_path = file_path.with_name(f"{file_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        shutil.copyfile(blob_path, tmp_path)
+        os.utime(tmp_path, ns=(blob_stat.st_atime_ns, blob_stat.st_mtime_ns))
+    except BaseException:
+        remove_temp_file(tmp_path)
+        raise
+    try:
+        os.replace(tmp_path, file_path)
+    except FileNotFoundError:
+        # The uploads folder went away mid-save (e.g. the chat was deleted)
+        remove_temp_file(tmp_path)
+        logger.warning(f"⚠️ Could not copy upload {file_path.name}: its folder was removed")
+    except BaseException:
+        remove_temp_file(tmp_path)
+        raise
+
+
+def store_session_blob(storage_dir, content):
+    """
+    Store one attachment field's text in the blob store
+    Base64 data URLs are stored decoded, so the blob is the real file
+    Returns: (digest, blob path, the 'data:...;base64,' header or None)
+    """
+    match = BASE64_DATA_URL_RE.match(content)
+    if match:
+        try:
+            digest, blob_path = store_blob(storage_dir, lambda: iter_base64(content, match.end()))
+            return digest, blob_path, match.group()
+        except ValueError:  # Also covers binascii.Error
+            pass
+    digest, blob_path = store_blob(storage_dir, lambda: iter((content.encode('utf-8'),)))
+    return digest, blob_path, None
+
+
+def store_session_blobs(chat_folder, messages):
+    """
+    Move attachment contents into the blob store and copy them into the chat's uploads folder
+    Returns: a copy of messages where each non-empty SESSION_BLOB_FIELDS string is
+    replaced by its digest in 'blobs' (field -> digest) and, for data URLs, its
+    header in 'blob_prefixes' (field -> 'data:...;base64,')
+    """
+    stored_messages = []
+    for msg in messages:
+        if msg.get('files'):
+            stored_files = []
+            for file_data in msg['files']:
+                blobs, prefixes, upload_blob = {}, {}, None
+                for field in SESSION_BLOB_FIELDS:
+                    content = file_data.get(field)
+                    if content and isinstance(content, str):
+                        blobs[field], upload_blob, prefix = store_session_blob(chat_folder.parent, content)
+                        if prefix is not None:
+                            prefixes[field] = prefix
+                
+                if blobs:
+                    # fileData comes last, so the uploads folder gets the original file over extracted text
+                    original_name = file_data.get('name', 'unnamed_file')
+                    file_path = chat_folder / 'uploads' / sanitize_filename(original_name)
+                    file_path.parent.mkdir(exist_ok=True)
+                    copy_upload(upload_blob, file_path)
+                    
+                    file_data = {key: value for key, value in file_data.items() if key not in blobs}
+                    file_data['blobs'] = blobs
+                    if prefixes:
+                        file_data['blob_prefixes'] = prefixes
+                stored_files.append(file_data)
+            msg = {**msg, 'files': stored_files}
+        stored_messages.append(msg)
+    return stored_messages
+
+
+def load_session_blob(storage_dir, digest, prefix, name):
+    """
+    Text of one stored attachment field (see store_session_blob)
+    A missing blob (e.g. a chat folder copied without STORAGE_PATH/blobs) fails the
+    load rather than coming back blank, which the client would then save for good
+    """
+    blob_path = storage_dir / SESSION_BLOBS_DIR / digest[:2] / digest
+    try:
+        if prefix is not None:
+            return prefix + base64.b64encode(blob_path.read_bytes()).decode('ascii')
+        return blob_path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Attachment {name} is missing from {storage_dir / SESSION_BLOBS_DIR} (blob {digest})") from None
+
+
+def load_session_blobs(storage_dir, messages):
+    """Put attachment contents back in place of blob references, in place"""
+    for msg in messages:
+        for file_data in msg.get('files') or ():
+            blobs = file_data.pop('blobs', None)
+            if not blobs:
+                continue
+            prefixes = file_data.pop('blob_prefixes', None) or {}
+            for field, digest in blobs.items():
+                file_data[field] = load_session_blob(storage_dir, digest, prefixes.get(field), file_data.get('name'))
+
+
+def write_session(chat_folder, session_data, digest):
+    """
+    Write session.json and any uploaded file contents into the chat folder
+    digest identifies the request body; it's kept in the session's index entry,
+    so a repeat of the body last saved by any server worker is skipped
+    Returns: False if nothing needed writing
+    """
+    session_file = chat_folder / 'session.json'
+    entry = read_session_index(chat_folder.parent).get(chat_folder.name)
+    if entry is not None and entry.get('save_digest') == digest and session_file.exists():
+        return False
+    
+    # Create chat-specific folder
+    chat_folder.mkdir(parents=True, exist_ok=True)
+    
+    # Attachments go to the blob store; session.json only keeps references
+    stored_data = {**session_data, 'messages': store_session_blobs(chat_folder, session_data['messages'])}
+    
+    # Save session metadata and messages, and record the session (with the
+    # body's digest) in the index - under one lock, so the digest another
+    # worker sees always matches what's in session.json
+    with session_index_lock(chat_folder.parent):
+        atomic_write_bytes(session_file, json_dumps(stored_data, indent=True))
+        index = read_session_index(chat_folder.parent)
+        index[chat_folder.name] = {**session_summary(session_data), 'save_digest': digest}
+        write_session_index(chat_folder.parent, index)
+    
+    return True
+
+
+def read_folder_header(chat_folder):
+    """Header of a chat folder's session.json, or None if the folder has none"""
+    try:
+        return read_session_header(chat_folder / 'session.json')
+    except FileNotFoundError:
+        return None
+
+
+def read_session_summaries(storage_dir):
+    """
+    List every saved session's metadata, most recently updated first
+    Served from the session index; only chat folders the index doesn't know
+    yet (e.g. saved by an older version) have their session.json parsed
+    """
+    with session_index_lock(storage_dir):
+        index = read_session_index(storage_dir)
+        # scandir reports each entry's type from readdir, so is_dir() costs no stat
+        with os.scandir(storage_dir) as entries:
+            chat_folders = {
+                entry.name for entry in entries
+                if entry.name.startswith('chat_') and entry.is_dir(follow_symlinks=False)
+            }
+        changed = False
+        
+        # Drop chats whose folder was removed
+        for name in index.keys() - chat_folders:
+            del index[name]
+            changed = True
+        
+        # Add chats the index hasn't seen - the reads are disk-latency bound,
+        # so a large backlog (e.g. the first listing after an upgrade) is read in parallel
+        new_folders = list(chat_folders - index.keys())
+        if len(new_folders) > 1:
+            with ThreadPoolExecutor(max_workers=SESSION_HEADER_WORKERS) as executor:
+                headers = list(executor.map(read_folder_header, [storage_dir / name for name in new_folders]))
+        else:
+            headers = [read_folder_header(storage_dir / name) for name in new_folders]
+        for name, header in zip(new_folders, headers):
+            if header is not None:
+                index[name] = header
+                changed = True
+        
+        if changed:
+            write_session_index(storage_dir, index)
+    
+    # Sort by updated_at descending
+    summaries = [
+        {field: value for field, value in entry.items() if field != 'save_digest'}
+        for entry in index.values()
+    ]
+    return sorted(summaries, key=lambda x: x.get('updated_at', ''), reverse=True)
+
+
+def read_session(session_file):
+    """Load a session.json file, or return None if it doesn't exist"""
+    if not session_file.exists():
+        return None
+    session_data = json_loads(session_file.read_bytes())
+    load_session_blobs(session_file.parent.parent, session_data.get('messages', []))
+    return session_data
+
+
 @app.route('/set_storage_path', methods=['POST'])
-def set_storage_path():
+async def set_storage_path():
     """Set the folder path where sessions will be stored"""
-    global STORAGE_PATH
+    global STORAGE_PATH, STORAGE_DIR
     
     try:
-        data = request.get_json()
+        data = await request.get_json()
         path = data.get('path')
         
         if not path:
@@ -835,15 +1910,14 @@ def set_storage_path():
             return jsonify({'success': False, 'error': 'Path is not a directory'}), 400
         
         # Test write permissions
-        test_file = path_obj / '.write_test'
         try:
-            test_file.write_text('test')
-            test_file.unlink()
+            await asyncio.to_thread(check_writable_dir, path_obj)
         except Exception as e:
             return jsonify({'success': False, 'error': f'Directory is not writable: {str(e)}'}), 400
         
-        STORAGE_PATH = str(path_obj.absolute())
-        save_storage_config(STORAGE_PATH)
+        STORAGE_DIR = path_obj.absolute()
+        STORAGE_PATH = str(STORAGE_DIR)
+        await asyncio.to_thread(save_storage_config, STORAGE_PATH)
         
         logger.info(f"✅ Storage path set to: {STORAGE_PATH}")
         return jsonify({
@@ -858,7 +1932,7 @@ def set_storage_path():
 
 
 @app.route('/get_storage_path', methods=['GET'])
-def get_storage_path():
+async def get_storage_path():
     """Get the current storage path"""
     return jsonify({
         'path': STORAGE_PATH,
@@ -867,13 +1941,13 @@ def get_storage_path():
 
 
 @app.route('/save_session', methods=['POST'])
-def save_session():
+async def save_session():
     """Save a chat session to disk"""
     if not STORAGE_PATH:
         return jsonify({'success': False, 'error': 'Storage path not configured'}), 400
     
     try:
-        data = request.get_json()
+        data = await request.get_json()
         chat_id = data.get('chat_id')
         chat_title = data.get('chat_title', 'Untitled Chat')
         messages = data.get('messages', [])
@@ -881,12 +1955,7 @@ def save_session():
         if not chat_id:
             return jsonify({'success': False, 'error': 'No chat_id provided'}), 400
         
-        # Create chat-specific folder
-        chat_folder = Path(STORAGE_PATH) / f"chat_{chat_id}"
-        chat_folder.mkdir(parents=True, exist_ok=True)
-        
-        # Save session metadata and messages
-        session_file = chat_folder / 'session.json'
+        chat_folder = STORAGE_DIR / f"chat_{chat_id}"
         session_data = {
             'chat_id': chat_id,
             'title': chat_title,
@@ -895,27 +1964,12 @@ def save_session():
             'messages': messages
         }
         
-        with open(session_file, 'w', encoding='utf-8') as f:
-            json.dump(session_data, f, indent=2, ensure_ascii=False)
-        
-        # Save uploaded files if any
-        for msg in messages:
-            if msg.get('files'):
-                for file_data in msg['files']:
-                    if file_data.get('content') or file_data.get('fileData'):
-                        original_name = file_data.get('name', 'unnamed_file')
-                        file_name = sanitize_filename(original_name)
-                        file_path = chat_folder / 'uploads' / file_name
-                        file_path.parent.mkdir(exist_ok=True)
-                        
-                        # Save file content
-                        content = file_data.get('content') or file_data.get('fileData', '')
-                        if isinstance(content, str):
-                            file_path.write_text(content, encoding='utf-8')
-                        else:
-                            file_path.write_bytes(content)
-        
-        logger.info(f"💾 Saved session {chat_id}: {chat_title}")
+        # Clients re-save whole chats; an identical body means nothing changed
+        digest = hashlib.blake2b(await request.get_data(), digest_size=16).hexdigest()
+        if await asyncio.to_thread(write_session, chat_folder, session_data, digest):
+            logger.info(f"💾 Saved session {chat_id}: {chat_title}")
+        else:
+            logger.info(f"💾 Session {chat_id} unchanged, skipped write")
         return jsonify({
             'success': True,
             'chat_id': chat_id,
@@ -924,38 +1978,18 @@ def save_session():
         })
         
     except Exception as e:
-        logger.error(f"Error saving session: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception(f"Error saving session: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @app.route('/load_sessions', methods=['GET'])
-def load_sessions():
+async def load_sessions():
     """Load all chat sessions from disk"""
     if not STORAGE_PATH:
         return jsonify({'success': False, 'error': 'Storage path not configured'}), 400
     
     try:
-        storage_dir = Path(STORAGE_PATH)
-        sessions = []
-        
-        # Find all chat folders
-        for chat_folder in storage_dir.glob('chat_*'):
-            if chat_folder.is_dir():
-                session_file = chat_folder / 'session.json'
-                if session_file.exists():
-                    with open(session_file, 'r', encoding='utf-8') as f:
-                        session_data = json.load(f)
-                        sessions.append({
-                            'chat_id': session_data.get('chat_id'),
-                            'title': session_data.get('title'),
-                            'created_at': session_data.get('created_at'),
-                            'updated_at': session_data.get('updated_at'),
-                            'message_count': len(session_data.get('messages', []))
-                        })
-        
-        # Sort by updated_at descending
-        sessions.sort(key=lambda x: x.get('updated_at', ''), reverse=True)
+        sessions = await asyncio.to_thread(read_session_summaries, STORAGE_DIR)
         
         logger.info(f"📂 Loaded {len(sessions)} sessions from disk")
         return jsonify({
@@ -970,21 +2004,19 @@ def load_sessions():
 
 
 @app.route('/load_session/<chat_id>', methods=['GET'])
-def load_session(chat_id):
+async def load_session(chat_id):
     """Load a specific chat session from disk"""
     if not STORAGE_PATH:
         return jsonify({'success': False, 'error': 'Storage path not configured'}), 400
     
     try:
-        chat_folder = Path(STORAGE_PATH) / f"chat_{chat_id}"
+        chat_folder = STORAGE_DIR / f"chat_{chat_id}"
         session_file = chat_folder / 'session.json'
         
-        if not session_file.exists():
+        session_data = await asyncio.to_thread(read_session, session_file)
+        if session_data is None:
             return jsonify({'success': False, 'error': 'Session not found'}), 404
         
-        with open(session_file, 'r', encoding='utf-8') as f:
-            session_data = json.load(f)
-        
         logger.info(f"📖 Loaded session {chat_id}")
         return jsonify({
             'success': True,
@@ -997,12 +2029,12 @@ def load_session(chat_id):
 
 
 @app.errorhandler(404)
-def not_found(error):
+async def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
 
 
 @app.errorhandler(500)
-def internal_error(error):
+async def internal_error(error):
     logger.error(f"Internal server error: {str(error)}")
     return jsonify({'error': 'Internal server error'}), 500
 
@@ -1030,7 +2062,7 @@ if __name__ == '__main__':
         logger.warning("  pip install 'markitdown[pdf,docx,pptx,xlsx,youtube-transcription]'  # Common formats")
         logger.warning("")
     
-    # Run the server
+    # Run the server (for production-style serving: hypercorn server:app --workers N)
     app.run(
         host='localhost',
         port=port,
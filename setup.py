@@ -69,11 +69,17 @@ def install_dependencies(venv_python):
     print("This may take a few minutes...\n")
     
     dependencies = [
-        "flask",
-        "flask-cors",
+        "quart",
+        "quart-cors",
+        "httpx[http2]",
+        "aiofiles",
         "markitdown[all]",
         "youtube-transcript-api",
-        "yt-dlp"
+        "yt-dlp",
+        "diskcache",
+        "orjson",
+        "ijson",
+        "brotli"
     ]
     
     # Upgrade pip first
@@ -98,7 +104,7 @@ def check_server_file():
     return True
 
 def start_server(venv_python):
-    """Start the Flask server"""
+    """Start the Quart server"""
     print_header("Starting Server")
     print("Server will run on http://localhost:5000")
     print("Press Ctrl+C to stop the server\n")
@@ -78,7 +78,7 @@ echo "Installing dependencies..."
 echo "This may take a few minutes..."
 echo ""
 
-pip install flask flask-cors "markitdown[all]" youtube-transcript-api yt-dlp
+pip install quart quart-cors "httpx[http2]" aiofiles "markitdown[all]" youtube-transcript-api yt-dlp diskcache orjson ijson brotli
 
 echo ""
 echo "✓ All dependencies installed successfully!"